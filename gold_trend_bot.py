@@ -2,22 +2,39 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import sys
 import time
 import json
+import bisect
 import argparse
 import datetime
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Dict, Any
 
 import requests
 
 try:
-    import yfinance as yf
+    import numpy as np
 except Exception as e:
-    print("Missing yfinance:", e, file=sys.stderr)
+    print("Missing dependency:", e, file=sys.stderr)
     sys.exit(1)
 
+# yfinance is imported lazily in _ticker(): it drags in pandas and html
+# parsers (~hundreds of ms), which cache-hit runs never need.
+
+try:
+    import orjson  # optional, faster state (de)serialization
+except ImportError:
+    orjson = None
+
 STATE_FILE = "gold_trend_state.json"
+CACHE_DIR = ".cache"
+# Daily bars only move intraday for the current session; refetch hourly
+# at most, and never reuse files across a date (date is in the filename).
+CACHE_TTL_SECS = 3600
 OZ_TO_GRAM = 31.1034768
 
 # Strategy config (ASCII-only so workflows can patch/translate safely)
@@ -87,51 +104,301 @@ CFG: Dict[str, Any] = {
     },
 }
 
+# Highest stop first, so the alert scan can stop at the first level the
+# price has not reached — everything after it is lower still.
+CFG["levels"]["stop_levels"].sort(key=lambda s: -s["price"])
+
+# Ascending mirror of the (descending) stop prices: the stops a price
+# has breached are a prefix of stop_levels whose length bisect gives us.
+_STOP_PRICES_ASC = [s["price"] for s in CFG["levels"]["stop_levels"]][::-1]
+
 API = "https://api.telegram.org/bot{}/sendMessage"
 
+# Keep-alive connections (Telegram and Yahoo), reused across requests.
+# Bounded retries with backoff on throttling/5xx; POST is included since
+# a sendMessage that drew one of these codes was not delivered.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=4,
+        max_retries=requests.adapters.Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True,
+        ),
+    ),
+)
+
+# Fetched history frames are memoized per process so e.g. the options
+# path can reuse what price_and_atr pulled (Tickers are cached below).
+_HISTORY: Dict[tuple, Any] = {}
+
+
+def _yf():
+    try:
+        import yfinance as yf
+    except Exception as e:
+        print("Missing dependency:", e, file=sys.stderr)
+        sys.exit(1)
+    return yf
+
+
+@functools.lru_cache(maxsize=64)
+def _ticker(symbol: str):
+    """One cookie/crumb-warmed Ticker per symbol (bounded for watchlists)."""
+    return _yf().Ticker(symbol, session=_SESSION)
+
+
+def _weekend_history(symbol: str, period: str, interval: str):
+    """周末金价不再更新：退回最近一个工作日的缓存，省掉整次 HTTP 拉取."""
+    today = datetime.date.today()
+    for back in range(1, 4):  # Sat -> Fri is 1 day back, Sun -> Fri is 2
+        path = _cache_path(symbol, period, interval, today - datetime.timedelta(days=back))
+        d = _load_cached_history(path, max_age=float("inf"))
+        if d is not None:
+            return d
+    return None
+
+
+def _history_many(symbols, period: str, interval: str = "1d") -> Dict[str, Any]:
+    """Daily bars for several symbols, memoized in-process and cached on
+    disk; misses are fetched with one batched download per 20 symbols."""
+    out: Dict[str, Any] = {}
+    misses = []
+    for sym in symbols:
+        key = (sym, period, interval)
+        d = _HISTORY.get(key)
+        if d is None:
+            d = _load_cached_history(_cache_path(sym, period, interval))
+            if d is None and datetime.date.today().weekday() >= 5:
+                d = _weekend_history(sym, period, interval)
+            if d is not None:
+                _HISTORY[key] = d
+        if d is not None:
+            out[sym] = d
+        else:
+            misses.append(sym)
+
+    for i in range(0, len(misses), 20):  # Yahoo serves ~20 symbols per request
+        chunk = misses[i : i + 20]
+        data = _yf().download(
+            chunk,
+            period=period,
+            interval=interval,
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            # We only read raw High/Low/Close; skip adjustment, action
+            # columns and repair passes entirely.
+            auto_adjust=False,
+            actions=False,
+            prepost=False,
+            repair=False,
+        )
+        for sym in chunk:
+            try:
+                d = data[sym].dropna(how="all")
+            except Exception:
+                # Single-symbol downloads may come back without the
+                # per-ticker column level
+                d = data.dropna(how="all") if len(chunk) == 1 else None
+            if d is None or d.empty:
+                continue
+            _store_cached_history(_cache_path(sym, period, interval), d)
+            _HISTORY[(sym, period, interval)] = d
+            out[sym] = d
+    return out
+
+
+def _history(symbol: str, period: str, interval: str = "1d"):
+    """Single-symbol convenience wrapper around _history_many."""
+    return _history_many([symbol], period, interval).get(symbol)
+
+
+TG_MAX_LEN = 4096  # Telegram hard limit per message
+
+_MD_ESCAPE_RE = re.compile(r"([_*\[`])")
+
+
+def _md_escape(s) -> str:
+    """Escape legacy-Markdown entities in config-sourced text.
+
+    A band or stop name containing '_' / '*' would otherwise make
+    Telegram reject the whole message with a 400.
+    """
+    return _MD_ESCAPE_RE.sub(r"\\\1", str(s))
+
+
+def _split_text(text: str, limit: int = TG_MAX_LEN) -> list:
+    """Split an over-long message on paragraph boundaries, hard-wrapping
+    any single paragraph that still exceeds the limit."""
+    if len(text) <= limit:
+        return [text]
+    parts = []
+    cur = ""
+    for para in text.split("\n\n"):
+        if len(para) > limit:  # pathological single paragraph
+            # Flush accumulated text first so the chunks stay in order
+            if cur:
+                parts.append(cur)
+                cur = ""
+            while len(para) > limit:
+                parts.append(para[:limit])
+                para = para[limit:]
+        if not cur:
+            cur = para
+        elif len(cur) + 2 + len(para) <= limit:
+            cur += "\n\n" + para
+        else:
+            parts.append(cur)
+            cur = para
+    if cur:
+        parts.append(cur)
+    return parts
+
 
 def tg(token: str, chat: str, text: str) -> bool:
-    """Send a Markdown-formatted message to Telegram."""
-    r = requests.post(
-        API.format(token),
-        json={"chat_id": chat, "text": text, "parse_mode": "Markdown"},
-        timeout=30,
-    )
-    if not r.ok:
-        print("Telegram failed", r.status_code, r.text, file=sys.stderr)
-    return r.ok
+    """Send a Markdown-formatted message to Telegram.
+
+    Messages above Telegram's 4096-char cap are split and sent in order;
+    before this they were rejected outright with a 400.
+    """
+    ok = True
+    for part in _split_text(text):
+        r = _SESSION.post(
+            API.format(token),
+            json={"chat_id": chat, "text": part, "parse_mode": "Markdown"},
+            timeout=(3, 10),  # (connect, read) — a stalled socket can't eat the cron slot
+        )
+        if not r.ok:
+            print("Telegram failed", r.status_code, r.text, file=sys.stderr)
+            ok = False
+    return ok
+
+
+def _send_and_save(token: str, chat: str, text: str, st: Dict[str, Any]) -> bool:
+    """POST to Telegram while the state file is written concurrently."""
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        fut = ex.submit(tg, token, chat, text)
+        save_state(st)
+        return bool(fut.result())
 
 
 def load_state() -> Dict[str, Any]:
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+    try:
+        with open(STATE_FILE, "rb") as f:
+            raw = f.read()
+        st = orjson.loads(raw) if orjson else json.loads(raw)
+    except Exception:
+        # Missing file and corrupt state both start fresh
+        return {}
+    # Kept as a set in memory (single hash probe per check); stored as a
+    # list on disk. Older files used a {key: true} map, which set() also
+    # accepts via its keys.
+    st["notified"] = set(st.get("notified") or ())
+    return st
 
 
 def save_state(st: Dict[str, Any]) -> None:
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(st, f, ensure_ascii=False, indent=2)
+    st = dict(st)
+    if isinstance(st.get("notified"), set):
+        st["notified"] = sorted(st["notified"])
+    if orjson:
+        data = orjson.dumps(st, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(st, ensure_ascii=False, indent=2).encode("utf-8")
+    # Write-then-rename so a crash can never leave a truncated state file
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, STATE_FILE)
+
+
+def _cache_path(symbol: str, period: str, interval: str, day=None) -> str:
+    """Cache file for one (symbol, period, interval) on the given date.
+
+    The date is baked into the filename, so yesterday's files simply stop
+    matching and the next run re-fetches — no explicit TTL bookkeeping.
+    """
+    safe = symbol.replace("=", "_").replace("/", "_")
+    stamp = (day or datetime.date.today()).strftime("%Y%m%d")
+    return os.path.join(CACHE_DIR, f"{safe}_{period}_{interval}_{stamp}.pkl")
+
+
+def _load_cached_history(path: str, max_age: float = CACHE_TTL_SECS):
+    try:
+        if time.time() - os.path.getmtime(path) > max_age:
+            return None
+    except OSError:
+        return None
+    try:
+        import pandas as pd
+
+        d = pd.read_pickle(path)
+        return d if not d.empty else None
+    except Exception:
+        # Corrupt / unreadable cache: fall through to a fresh fetch
+        return None
+
+
+def _store_cached_history(path: str, d) -> None:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        d.to_pickle(path)
+    except Exception as e:
+        print("history cache write failed:", e, file=sys.stderr)
+
+
+def _price_atr_from_frame(d, look: int):
+    """Extract (last close, avg high-low over `look` days) from one frame."""
+    p = float(d["Close"].dropna().iloc[-1])
+    high = d["High"].to_numpy()
+    low = d["Low"].to_numpy()
+    # Only the last window is ever read, so a single slice mean beats
+    # building the whole rolling series.
+    a = None
+    if len(high) >= look:
+        rng = high[-look:] - low[-look:]
+        rng = rng[~np.isnan(rng)]  # partial rows (holidays etc.)
+        if rng.size:
+            a = float(rng.mean())
+    return p, a
 
 
 def price_and_atr(symbol: str, look: int = 14):
     """Fetch last close price and a simple ATR-like indicator (avg high-low)."""
     period_days = max(look + 2, 20)
-    d = yf.Ticker(symbol).history(period=f"{period_days}d", interval="1d")
-    if d.empty:
+    d = _history(symbol, f"{period_days}d")
+    if d is None or d.empty:
         raise SystemExit("empty data for symbol %s" % symbol)
-    p = float(d["Close"].dropna().iloc[-1])
-    try:
-        a = float((d["High"] - d["Low"]).rolling(look).mean().dropna().iloc[-1])
-    except Exception:
-        a = None
-    return p, a
+    return _price_atr_from_frame(d, look)
+
+
+def price_and_atr_many(symbols, look: int = 14) -> Dict[str, tuple]:
+    """price_and_atr for a watchlist: {symbol: (price, atr)}.
+
+    Symbols Yahoo returned nothing for are simply absent from the result.
+    """
+    period_days = max(look + 2, 20)
+    frames = _history_many(list(symbols), f"{period_days}d")
+    return {sym: _price_atr_from_frame(d, look) for sym, d in frames.items()}
+
+
+_FX_RATE: Dict[str, Any] = {}
 
 
 def _get_fx_rate(cfg: Dict[str, Any]):
+    """Per-process cached wrapper around _read_fx_rate."""
+    if "rate" not in _FX_RATE:
+        _FX_RATE["rate"] = _read_fx_rate(cfg)
+    return _FX_RATE["rate"]
+
+
+def _read_fx_rate(cfg: Dict[str, Any]):
     """
     获取 USD/CNY 汇率：
     优先读环境变量 FX_USDCNY；
@@ -156,39 +423,104 @@ def _get_fx_rate(cfg: Dict[str, Any]):
     return None
 
 
-def fmt_status(cfg: Dict[str, Any], p: float, a: float, title: str) -> str:
-    """Format the status / heartbeat / signals header."""
-    L = cfg["levels"]
-    plan_max = float(cfg.get("plan_gold_max_pct", 0.0))
-    fair_band = cfg.get("fair_value_band", [None, None])
-    fair_lo, fair_hi = fair_band if len(fair_band) == 2 else (None, None)
-    fx_rate = _get_fx_rate(cfg)
+@dataclass(frozen=True, slots=True)
+class Band:
+    """One buy band from CFG, with the RMB/g display suffix precomputed.
 
-    out = [f"*{title}*  ", f"Price: *{p:.2f}* USD/oz"]
+    Attribute access replaces the per-check dict lookups in the alert
+    path, and baking the FX conversion in at construction guarantees
+    fmt_status and check_and_alert can never drift apart.
+    """
 
-    # === ATR 块 ===
-    if a:
-        ap = a / p * 100.0 if p > 0 else 0.0
-        look = int(cfg.get("atr", {}).get("lookback_days", 14))
-        m1 = p - 1.0 * a
-        m15 = p - 1.5 * a
-        m2 = p - 2.0 * a
-        out.append(f"ATR({look}): ~*{a:.1f}* (*{ap:.2f}%*)")
-        out.append(
-            "Dynamic refs (ATR): 1.0x~*{m1:.0f}*, 1.5x~*{m15:.0f}*, 2.0x~*{m2:.0f}*".format(
-                m1=m1, m15=m15, m2=m2
+    name: str
+    low: int
+    high: int
+    target_plan_pct: float
+    rmb_part: str
+
+
+def _build_buy_bands() -> tuple:
+    fx_rate = _get_fx_rate(CFG)
+    bands = []
+    for b in CFG["levels"]["buy_bands"]:
+        if fx_rate:
+            cny_lo = b["low"] * fx_rate / OZ_TO_GRAM
+            cny_hi = b["high"] * fx_rate / OZ_TO_GRAM
+            rmb_part = ", ~{lo:.0f}-{hi:.0f} RMB/g".format(lo=cny_lo, hi=cny_hi)
+        else:
+            rmb_part = ""
+        bands.append(
+            Band(
+                name=b["name"],
+                low=b["low"],
+                high=b["high"],
+                target_plan_pct=float(b.get("target_plan_pct", 0.0)),
+                rmb_part=rmb_part,
             )
         )
-        out.append(
-            "Stops (pick one):\n"
-            f"- Conservative 1.0x: ~*{m1:.0f}* — tight risk / short-term\n"
-            f"- Standard    1.5x: ~*{m15:.0f}* — default choice\n"
-            f"- Loose       2.0x: ~*{m2:.0f}* — more room / smaller size"
-        )
-        out.append("How to use: if close < your stop -> cut 50–100% per plan.")
+    return tuple(bands)
+
+
+BUY_BANDS = _build_buy_bands()  # config (display) order
+
+# Ascending by low edge; the band containing a price is found by bisection
+_BUY_BANDS_ASC = tuple(sorted(BUY_BANDS, key=lambda b: b.low))
+_BAND_LOWS = [b.low for b in _BUY_BANDS_ASC]
+
+
+def _find_buy_band(p: float):
+    """Return the Band containing price p, or None."""
+    i = bisect.bisect_right(_BAND_LOWS, p) - 1
+    if 0 <= i < len(_BUY_BANDS_ASC):
+        b = _BUY_BANDS_ASC[i]
+        if b.low <= p <= b.high:
+            return b
+    return None
+
 
-    # === 组合计划 & 合理价区间 ===
-    out.append("--- Plan ---")
+# Conservative / standard / loose stop distances, in ATR multiples
+_STOP_MULS = np.array([1.0, 1.5, 2.0])
+
+
+def _atr_stops(p: float, a: float):
+    """Dynamic stop references at the three standard ATR multiples."""
+    return p - _STOP_MULS * a
+
+
+def _fmt_atr_block(cfg: Dict[str, Any], p: float, a: float) -> list:
+    """ATR summary plus the three ATR-multiple stop references."""
+    if not a:
+        return []
+    ap = a / p * 100.0 if p > 0 else 0.0
+    look = int(cfg.get("atr", {}).get("lookback_days", 14))
+    m1, m15, m2 = _atr_stops(p, a)
+    return [
+        f"ATR({look}): ~*{a:.1f}* (*{ap:.2f}%*)",
+        "Dynamic refs (ATR): 1.0x~*{m1:.0f}*, 1.5x~*{m15:.0f}*, 2.0x~*{m2:.0f}*".format(
+            m1=m1, m15=m15, m2=m2
+        ),
+        "Stops (pick one):\n"
+        f"- Conservative 1.0x: ~*{m1:.0f}* — tight risk / short-term\n"
+        f"- Standard    1.5x: ~*{m15:.0f}* — default choice\n"
+        f"- Loose       2.0x: ~*{m2:.0f}* — more room / smaller size",
+        "How to use: if close < your stop -> cut 50–100% per plan.",
+    ]
+
+
+# Plan and rules text depend only on the static config (plus the FX rate
+# read once per process), so each block is rendered a single time.
+_FMT_CACHE: Dict[str, list] = {}
+
+
+def _fmt_plan_block(cfg: Dict[str, Any]) -> list:
+    """组合计划 & 合理价区间."""
+    cached = _FMT_CACHE.get("plan")
+    if cached is not None:
+        return cached
+    plan_max = float(cfg.get("plan_gold_max_pct", 0.0))
+    fair_band = cfg.get("fair_value_band", [None, None])
+    fair_lo, fair_hi = fair_band if len(fair_band) == 2 else (None, None)
+    out = ["--- Plan ---"]
     out.append(
         "- Plan max gold weight: *{pct:.1f}%* of total portfolio".format(
             pct=plan_max * 100.0
@@ -200,10 +532,19 @@ def fmt_status(cfg: Dict[str, Any], p: float, a: float, title: str) -> str:
                 lo=fair_lo, hi=fair_hi
             )
         )
+    _FMT_CACHE["plan"] = out
+    return out
+
+
+def _fmt_rules_block(cfg: Dict[str, Any]) -> list:
+    """买入区 / 止盈 / 风险位（相对计划仓位）."""
+    cached = _FMT_CACHE.get("rules")
+    if cached is not None:
+        return cached
+    L = cfg["levels"]
+    plan_max = float(cfg.get("plan_gold_max_pct", 0.0))
 
-    # === 买入区（相对计划仓位） ===
-    out.append("--- Rules ---")
-    out.append("*Buy bands*:")
+    out = ["--- Rules ---", "*Buy bands*:"]
     uc = cfg.get("confirm_zone_breakout", {}).get("upper_confirm", [])
     if isinstance(uc, list) and len(uc) == 2:
         target_plan = 0.30  # 30% 计划仓
@@ -214,31 +555,23 @@ def fmt_status(cfg: Dict[str, Any], p: float, a: float, title: str) -> str:
             )
         )
 
-    for b in L["buy_bands"]:
-        target_plan = float(b.get("target_plan_pct", 0.0))
-        plan_percent = target_plan * 100.0
-        portfolio_percent = plan_max * target_plan * 100.0
-        if fx_rate:
-            cny_lo = b["low"] * fx_rate / OZ_TO_GRAM
-            cny_hi = b["high"] * fx_rate / OZ_TO_GRAM
-            rmb_part = ", ~{lo:.0f}-{hi:.0f} RMB/g".format(lo=cny_lo, hi=cny_hi)
-        else:
-            rmb_part = ""
+    for b in BUY_BANDS:
+        plan_percent = b.target_plan_pct * 100.0
+        portfolio_percent = plan_max * b.target_plan_pct * 100.0
         out.append(
             "- {name}: {lo:.0f}-{hi:.0f} -> target *{plan:.0f}% plan* (~*{pf:.1f}%* of portfolio{rmb})".format(
-                name=b["name"],
-                lo=b["low"],
-                hi=b["high"],
+                name=_md_escape(b.name),
+                lo=b.low,
+                hi=b.high,
                 plan=plan_percent,
                 pf=portfolio_percent,
-                rmb=rmb_part,
+                rmb=b.rmb_part,
             )
         )
 
-    # === 止盈 & 风险位 ===
     tps = ", ".join(str(t["price"]) for t in L["take_profit"])
     out.append("*Take profit*: " + tps)
-    risks = "; ".join(f"{s['name']}@{s['price']}" for s in L["stop_levels"])
+    risks = "; ".join(f"{_md_escape(s['name'])}@{s['price']}" for s in L["stop_levels"])
     out.append("*Risk*: " + risks)
     if isinstance(uc, list) and len(uc) == 2:
         out.append(
@@ -246,7 +579,24 @@ def fmt_status(cfg: Dict[str, Any], p: float, a: float, title: str) -> str:
                 lo=uc[0], hi=uc[1]
             )
         )
+    _FMT_CACHE["rules"] = out
+    return out
+
+
+def fmt_status(cfg: Dict[str, Any], p: float, a: float, title: str) -> str:
+    """Format the full status / signals header."""
+    out = [f"*{title}*  ", f"Price: *{p:.2f}* USD/oz"]
+    out += _fmt_atr_block(cfg, p, a)
+    out += _fmt_plan_block(cfg)
+    out += _fmt_rules_block(cfg)
+    return "\n".join(out)
 
+
+def fmt_heartbeat(cfg: Dict[str, Any], p: float, a: float, title: str) -> str:
+    """Shorter heartbeat: price + ATR + plan summary, no full rules dump."""
+    out = [f"*{title}*  ", f"Price: *{p:.2f}* USD/oz"]
+    out += _fmt_atr_block(cfg, p, a)
+    out += _fmt_plan_block(cfg)
     return "\n".join(out)
 
 
@@ -254,12 +604,20 @@ def in_band(p: float, lo: float, hi: float) -> bool:
     return lo <= p <= hi
 
 
+def _band_msg(name: str, lo: float, hi: float, p: float, plan: float, pf: float, rmb: str) -> str:
+    name = _md_escape(name)
+    return (
+        f"Enter buy band *{name}* {lo}-{hi} | price *{p:.2f}* -> "
+        f"target *{plan:.0f}% plan* (~*{pf:.1f}%* of portfolio{rmb}, scale in)"
+    )
+
+
 def should_once(st: Dict[str, Any], key: str) -> bool:
-    return not st.get("notified", {}).get(key, False)
+    return key not in st.setdefault("notified", set())
 
 
 def mark_once(st: Dict[str, Any], key: str) -> None:
-    st.setdefault("notified", {})[key] = True
+    st.setdefault("notified", set()).add(key)
 
 
 def options_lotto_check(
@@ -276,44 +634,38 @@ def options_lotto_check(
     if not opt_cfg or not opt_cfg.get("enabled", False):
         return None
 
+    # 控制频率：只提醒一次，直到状态重置（最便宜的守卫放最前面）
+    if opt_cfg.get("notify_once", True) and st.get("options_lotto_suggested", False):
+        return None
+
     # 只在 Band B / Band C 这类便宜区间里考虑 options lotto
-    buy_bands = cfg["levels"]["buy_bands"]
     cheap_band_names = {"Band B", "Band C"}
     in_cheap_zone = any(
-        (b["name"] in cheap_band_names) and in_band(gold_price_spot, b["low"], b["high"])
-        for b in buy_bands
+        (b.name in cheap_band_names) and in_band(gold_price_spot, b.low, b.high)
+        for b in BUY_BANDS
     )
     if not in_cheap_zone:
         return None
 
-    # 控制频率：只提醒一次，直到状态重置
-    if opt_cfg.get("notify_once", True) and st.get("options_lotto_suggested", False):
-        return None
-
     try:
         underlying = opt_cfg.get("underlying", "GLD")
-        t = yf.Ticker(underlying)
+        t = _ticker(underlying)
 
         # 1) 挑最近的一年期到期日
-        today = datetime.date.today()
         target_days = int(opt_cfg.get("target_days", 365))
         tol = int(opt_cfg.get("tenor_tolerance_days", 90))
-        best_exp = None
-        best_diff = None
-
-        # yfinance 提供的 options 列表是字符串日期
-        for exp_str in t.options:
-            try:
-                exp = datetime.datetime.strptime(exp_str, "%Y-%m-%d").date()
-            except Exception:
-                continue
-            d = abs((exp - today).days - target_days)
-            if best_diff is None or d < best_diff:
-                best_diff = d
-                best_exp = exp_str
+        expirations = t.options
+        if not expirations:
+            return None
 
-        if best_exp is None or (best_diff is not None and best_diff > tol):
+        # yfinance 提供的 options 列表是 "YYYY-MM-DD" 字符串，可直接向量化
+        exps = np.array(expirations, dtype="datetime64[D]")
+        today = np.datetime64(datetime.date.today(), "D")
+        diffs = np.abs((exps - today).astype(int) - target_days)
+        i = int(diffs.argmin())
+        if diffs[i] > tol:
             return None
+        best_exp = expirations[i]
 
         # 2) 拉期权链，取 calls
         chain = t.option_chain(best_exp)
@@ -321,11 +673,10 @@ def options_lotto_check(
         if "impliedVolatility" not in calls.columns:
             return None
 
-        # 3) 取 GLD 当前价格
-        hist = t.history(period="2d", interval="1d")
-        if hist.empty:
+        # 3) 取 GLD 当前价格（fast_info 是单字段端点，比拉一段历史便宜）
+        gld_price = float(t.fast_info["last_price"])
+        if not gld_price > 0:
             return None
-        gld_price = float(hist["Close"].dropna().iloc[-1])
 
         # 4) 过滤 35%–60% OTM 的 call，算平均隐含波
         otm_low = float(opt_cfg.get("otm_low", 0.35))
@@ -333,11 +684,14 @@ def options_lotto_check(
         lo_strike = gld_price * (1.0 + otm_low)
         hi_strike = gld_price * (1.0 + otm_high)
 
-        sub = calls[(calls["strike"] >= lo_strike) & (calls["strike"] <= hi_strike)]
-        if sub.empty or "impliedVolatility" not in sub:
+        strikes = calls["strike"].to_numpy()
+        mask = (strikes >= lo_strike) & (strikes <= hi_strike)
+        iv = calls["impliedVolatility"].to_numpy()[mask]
+        iv = iv[~np.isnan(iv)]  # pandas .mean() skipped NaN; keep that
+        if iv.size == 0:
             return None
 
-        iv_mean = float(sub["impliedVolatility"].mean())
+        iv_mean = float(iv.mean())
         iv_threshold = float(opt_cfg.get("iv_threshold", 0.25))
 
         if iv_mean > iv_threshold:
@@ -347,7 +701,7 @@ def options_lotto_check(
         max_alloc = float(opt_cfg.get("max_allocation_pct", 0.005))
         msg = (
             "Options lotto idea (tail hedge):\n"
-            f"- Underlying: {underlying}, spot ~{gld_price:.2f} USD\n"
+            f"- Underlying: {_md_escape(underlying)}, spot ~{gld_price:.2f} USD\n"
             f"- Use ~1Y deep OTM calls (expiry {best_exp}, strikes ≈ {lo_strike:.0f}–{hi_strike:.0f})\n"
             f"- Avg implied vol: ~{iv_mean*100:.1f}% (below threshold {iv_threshold*100:.1f}%)\n"
             f"- Suggested max allocation: ~{max_alloc*100:.2f}% of total portfolio per year\n"
@@ -376,35 +730,23 @@ def check_and_alert(
     L = cfg["levels"]
     once = bool(cfg.get("notify_once_per_band", True))
     plan_max = float(cfg.get("plan_gold_max_pct", 0.0))
-    fx_rate = _get_fx_rate(cfg)
-
-    # Buy bands
-    for b in L["buy_bands"]:
-        if in_band(p, b["low"], b["high"]):
-            k = f"buy_{b['name']}"
-            if (not once) or should_once(st, k):
-                target_plan = float(b.get("target_plan_pct", 0.0))
-                plan_percent = target_plan * 100.0
-                portfolio_percent = plan_max * target_plan * 100.0
-                if fx_rate:
-                    cny_lo = b["low"] * fx_rate / OZ_TO_GRAM
-                    cny_hi = b["high"] * fx_rate / OZ_TO_GRAM
-                    rmb_part = ", ~{lo:.0f}-{hi:.0f} RMB/g".format(lo=cny_lo, hi=cny_hi)
-                else:
-                    rmb_part = ""
-                msgs.append(
-                    "Enter buy band *{name}* {lo}-{hi} | price *{p:.2f}* -> "
-                    "target *{plan:.0f}% plan* (~*{pf:.1f}%* of portfolio{rmb}, scale in)".format(
-                        name=b["name"],
-                        lo=b["low"],
-                        hi=b["high"],
-                        p=p,
-                        plan=plan_percent,
-                        pf=portfolio_percent,
-                        rmb=rmb_part,
-                    )
+
+    # Buy bands overlap only at shared edges (e.g. 3920 is Band B's high
+    # and Band A's low); bisect awards an edge price to the higher band,
+    # so exactly one alert fires where the old scan fired two.
+    b = _find_buy_band(p)
+    if b is not None:
+        k = f"buy_{b.name}"
+        if (not once) or should_once(st, k):
+            plan_percent = b.target_plan_pct * 100.0
+            portfolio_percent = plan_max * b.target_plan_pct * 100.0
+            msgs.append(
+                _band_msg(
+                    b.name, b.low, b.high, p,
+                    plan_percent, portfolio_percent, b.rmb_part,
                 )
-                mark_once(st, k)
+            )
+            mark_once(st, k)
 
     # Upper confirm zone
     uc = cfg.get("confirm_zone_breakout", {}).get("upper_confirm", [])
@@ -421,28 +763,28 @@ def check_and_alert(
             )
             mark_once(st, k)
 
-    # Fixed risk levels
-    for s in L["stop_levels"]:
-        if p <= s["price"]:
-            k = f"stop_{s['name']}"
-            if (not once) or should_once(st, k):
-                action_map = {
-                    "trim_to_50": "Trim total position to 50% and wait",
-                    "cut_to_0_30": "Cut position to 0-30%, re-evaluate",
-                }
-                act = action_map.get(s.get("action", ""), "Risk action")
-                msgs.append(
-                    "Risk level *{name}* @ {level} | price *{p:.2f}* -> {act}".format(
-                        name=s["name"], level=s["price"], p=p, act=act
-                    )
+    # Fixed risk levels: breached stops (price >= p) are a prefix of the
+    # descending list, located by bisection like the buy bands
+    stops = L["stop_levels"]
+    n_hit = len(stops) - bisect.bisect_left(_STOP_PRICES_ASC, p)
+    for s in stops[:n_hit]:
+        k = f"stop_{s['name']}"
+        if (not once) or should_once(st, k):
+            action_map = {
+                "trim_to_50": "Trim total position to 50% and wait",
+                "cut_to_0_30": "Cut position to 0-30%, re-evaluate",
+            }
+            act = action_map.get(s.get("action", ""), "Risk action")
+            msgs.append(
+                "Risk level *{name}* @ {level} | price *{p:.2f}* -> {act}".format(
+                    name=_md_escape(s["name"]), level=s["price"], p=p, act=act
                 )
-                mark_once(st, k)
+            )
+            mark_once(st, k)
 
     # Dynamic stops (3 profiles)
     if a and a > 0:
-        m1 = p - 1.0 * a
-        m15 = p - 1.5 * a
-        m2 = p - 2.0 * a
+        m1, m15, m2 = _atr_stops(p, a)
         msgs.append(
             "Stops (pick one):\n"
             f"- Conservative 1.0x: ~*{m1:.0f}*\n"
@@ -457,10 +799,18 @@ def check_and_alert(
         msgs.append(lotto_msg)
 
     if msgs:
-        header = fmt_status(cfg, p, a, title="Gold Trend | Signals")
-        body = header + "\n\n--- Realtime signals ---\n" + ("\n\n".join(msgs))
-        tg(token, chat, body)
-        save_state(st)
+        now = int(time.time())
+        # The rules header repeats static text; resend it at most every
+        # 6h and push only the signal delta in between.
+        if now - int(st.get("last_full_status_ts", 0)) < 6 * 3600:
+            body = "*Gold Trend | Signals*  \n--- Realtime signals ---\n" + (
+                "\n\n".join(msgs)
+            )
+        else:
+            header = fmt_status(cfg, p, a, title="Gold Trend | Signals")
+            body = header + "\n\n--- Realtime signals ---\n" + ("\n\n".join(msgs))
+            st["last_full_status_ts"] = now
+        _send_and_save(token, chat, body, st)
         return True
     return False
 
@@ -482,9 +832,10 @@ def main() -> None:
     p, a = price_and_atr(args.symbol, look=look)
 
     if args.mode == "status":
-        tg(token, chat, fmt_status(CFG, p, a, title="Gold Trend | Status"))
         st["last_status_ts"] = int(time.time())
-        save_state(st)
+        # A status message carries the full rules block as well
+        st["last_full_status_ts"] = st["last_status_ts"]
+        _send_and_save(token, chat, fmt_status(CFG, p, a, title="Gold Trend | Status"), st)
         return
 
     # Normal "run" mode: check realtime signals; if none fired, send heartbeat every 6h
@@ -493,9 +844,8 @@ def main() -> None:
         last = st.get("last_summary_ts", 0)
         now = int(time.time())
         if now - last > 6 * 3600:
-            tg(token, chat, fmt_status(CFG, p, a, title="Gold Trend | Heartbeat"))
             st["last_summary_ts"] = now
-            save_state(st)
+            _send_and_save(token, chat, fmt_heartbeat(CFG, p, a, title="Gold Trend | Heartbeat"), st)
 
 
 if __name__ == "__main__":